@@ -2,9 +2,12 @@
 """
 Data Aggregator - Combines all data into final dashboard JSON
 """
+import heapq
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -14,39 +17,37 @@ def build_risk_categories_widget(markets_data):
     """
     Build risk categories widget with top-5 medium and low risk opportunities
     """
-    all_outcomes = []
+    medium_items = []
+    low_items = []
 
     for market in markets_data:
         for outcome in market.get('outcomes', []):
             risk_metrics = outcome.get('risk_metrics', {})
             risk_category = risk_metrics.get('risk_category')
 
-            if risk_category in ['medium', 'low']:
-                all_outcomes.append({
-                    'market_title': market.get('question', ''),
-                    'market_url': market.get('url', ''),
-                    'market_end_date': market.get('end_date', ''),
-                    'outcome_name': outcome.get('name', ''),
-                    'probability': outcome.get('probability', 0),
-                    'multiplier': risk_metrics.get('multiplier', 0),
-                    'score': risk_metrics.get('score', 0),
-                    'risk_category': risk_category,
-                    'volume': outcome.get('volume', 0),
-                    'image': market.get('image', '')
-                })
-
-    # Sort by score (best risk-reward first)
-    medium_risk = sorted(
-        [o for o in all_outcomes if o['risk_category'] == 'medium'],
-        key=lambda x: x['score'],
-        reverse=True
-    )[:5]
-
-    low_risk = sorted(
-        [o for o in all_outcomes if o['risk_category'] == 'low'],
-        key=lambda x: x['score'],
-        reverse=True
-    )[:5]
+            if risk_category == 'medium':
+                bucket = medium_items
+            elif risk_category == 'low':
+                bucket = low_items
+            else:
+                continue
+
+            bucket.append({
+                'market_title': market.get('question', ''),
+                'market_url': market.get('url', ''),
+                'market_end_date': market.get('end_date', ''),
+                'outcome_name': outcome.get('name', ''),
+                'probability': outcome.get('probability', 0),
+                'multiplier': risk_metrics.get('multiplier', 0),
+                'score': risk_metrics.get('score', 0),
+                'risk_category': risk_category,
+                'volume': outcome.get('volume', 0),
+                'image': market.get('image', '')
+            })
+
+    # Top-5 by score (best risk-reward first)
+    medium_risk = heapq.nlargest(5, medium_items, key=lambda x: x['score'])
+    low_risk = heapq.nlargest(5, low_items, key=lambda x: x['score'])
 
     return {
         'medium_risk': medium_risk,
@@ -57,19 +58,20 @@ def build_risk_categories_widget(markets_data):
 # Closing Soon widget removed - not useful for users
 
 
-def build_news_feed_widget(news_analysis, markets_data):
+def build_news_feed_widget(news_analysis, markets_by_id):
     """
     Build news feed widget with top-10 most relevant news
+
+    Args:
+        news_analysis: dict with news analysis results
+        markets_by_id: dict of market_id -> market
     """
     news_mapping = news_analysis.get('news_market_mapping', [])
 
     # Group by market
-    news_by_market = {}
+    news_by_market = defaultdict(list)
     for item in news_mapping:
-        market_id = item.get('market_id', '')
-        if market_id not in news_by_market:
-            news_by_market[market_id] = []
-        news_by_market[market_id].append(item)
+        news_by_market[item.get('market_id', '')].append(item)
 
     # Get best news per market
     top_news = []
@@ -78,7 +80,7 @@ def build_news_feed_widget(news_analysis, markets_data):
         best_news = max(news_list, key=lambda x: x.get('relevance_score', 0))
 
         # Find market details
-        market = next((m for m in markets_data if m.get('market_id') == market_id), None)
+        market = markets_by_id.get(market_id)
 
         if market:
             top_news.append({
@@ -93,10 +95,8 @@ def build_news_feed_widget(news_analysis, markets_data):
                 'reasoning': best_news.get('reasoning', '')
             })
 
-    # Sort by relevance score and take top 10
-    top_news = sorted(top_news, key=lambda x: x['relevance_score'], reverse=True)[:10]
-
-    return top_news
+    # Take top 10 by relevance score
+    return heapq.nlargest(10, top_news, key=itemgetter('relevance_score'))
 
 
 def build_dashboard_data(markets_with_metrics, news_analysis):
@@ -111,23 +111,25 @@ def build_dashboard_data(markets_with_metrics, news_analysis):
         dict with complete dashboard data
     """
     logger.info("Building dashboard data...")
+    now_iso = datetime.now(timezone.utc).isoformat()
+    markets_by_id = {m.get('market_id'): m for m in markets_with_metrics}
 
     # Count markets by category
     trending_count = sum(1 for m in markets_with_metrics if 'trending' in m.get('tags', []))
     crypto_count = sum(1 for m in markets_with_metrics if 'crypto' in m.get('tags', []))
 
     dashboard_data = {
-        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'generated_at': now_iso,
         'widgets': {
             'risk_categories': build_risk_categories_widget(markets_with_metrics),
-            'news_feed': build_news_feed_widget(news_analysis, markets_with_metrics)
+            'news_feed': build_news_feed_widget(news_analysis, markets_by_id)
         },
         'metadata': {
             'total_markets': len(markets_with_metrics),
             'trending_count': trending_count,
             'crypto_count': crypto_count,
             'news_analyzed': news_analysis.get('stats', {}).get('total_analyzed', 0),
-            'snapshot_time': datetime.now(timezone.utc).isoformat()
+            'snapshot_time': now_iso
         }
     }
 
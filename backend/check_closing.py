@@ -7,8 +7,9 @@ with open('data/markets_with_metrics.json', 'r') as f:
     markets_data = json.load(f)['markets']
 
 now = datetime.now(timezone.utc)
-candidates = []
 
+# Single pass: every outcome with mult >= 1.1 in markets closing in 30 days
+all_qualifying = []
 for market in markets_data:
     end_date_str = market.get('end_date', '')
     if not end_date_str:
@@ -17,25 +18,27 @@ for market in markets_data:
     try:
         end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
         hours_until_close = (end_date - now).total_seconds() / 3600
+    except (ValueError, TypeError):
+        continue
 
-        # Check markets closing in 30 days
-        if 0 < hours_until_close <= 720:  # 30 days = 720 hours
-            for outcome in market.get('outcomes', []):
-                prob = outcome.get('probability', 0)
-                mult = outcome.get('risk_metrics', {}).get('multiplier', 0)
-
-                # Check if meets criteria
-                if 0.60 <= prob <= 0.90 and mult >= 1.1:
-                    candidates.append({
-                        'question': market.get('question', '')[:60],
-                        'outcome': outcome.get('name', ''),
-                        'prob': prob,
-                        'mult': round(mult, 2),
-                        'hours': round(hours_until_close, 1)
-                    })
-    except:
+    if not 0 < hours_until_close <= 720:  # 30 days = 720 hours
         continue
 
+    for outcome in market.get('outcomes', []):
+        mult = outcome.get('risk_metrics', {}).get('multiplier', 0)
+        if mult >= 1.1:
+            all_qualifying.append({
+                'question': market.get('question', '')[:60],
+                'outcome': outcome.get('name', ''),
+                'prob': outcome.get('probability', 0),
+                'mult': round(mult, 2),
+                'hours': round(hours_until_close, 1)
+            })
+
+# Strict criteria additionally require 60-90% probability
+candidates = [c for c in all_qualifying if 0.60 <= c['prob'] <= 0.90]
+candidates_relaxed = all_qualifying
+
 print(f'Всего кандидатов для closing soon: {len(candidates)}')
 print()
 
@@ -54,31 +57,6 @@ else:
     print('Давайте проверим, есть ли рынки хотя бы без ограничения вероятности...')
     print()
 
-    # Check without probability restriction
-    candidates_relaxed = []
-    for market in markets_data:
-        end_date_str = market.get('end_date', '')
-        if not end_date_str:
-            continue
-
-        try:
-            end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-            hours_until_close = (end_date - now).total_seconds() / 3600
-
-            if 0 < hours_until_close <= 720:
-                for outcome in market.get('outcomes', []):
-                    mult = outcome.get('risk_metrics', {}).get('multiplier', 0)
-                    if mult >= 1.1:
-                        candidates_relaxed.append({
-                            'question': market.get('question', '')[:60],
-                            'outcome': outcome.get('name', ''),
-                            'prob': outcome.get('probability', 0),
-                            'mult': round(mult, 2),
-                            'hours': round(hours_until_close, 1)
-                        })
-        except:
-            continue
-
     if candidates_relaxed:
         print(f'С расслабленными критериями: {len(candidates_relaxed)} кандидатов')
         print()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+JSON Utils - Fast JSON encoding/decoding via orjson with stdlib fallback
+"""
+import os
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Pretty-print output files only when debugging (indentation roughly doubles file size)
+DEBUG = os.getenv('DEBUG', '').lower() in ('1', 'true', 'yes')
+
+# Check for orjson (C implementation, much faster than stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.info("orjson not available, using stdlib json")
+
+
+def dumps(data, indent=False):
+    """
+    Serialize data to UTF-8 encoded JSON bytes
+
+    Args:
+        data: JSON-serializable object
+        indent: bool, pretty-print with 2-space indentation
+
+    Returns:
+        bytes
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def loads(data):
+    """Deserialize JSON from str or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path, data, indent=DEBUG):
+    """
+    Write data as JSON bytes to path (compact unless DEBUG is set)
+
+    Atomic: writes a sibling temp file and os.replace()s it over path, so
+    a crash mid-write never leaves a truncated file for the next run.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(dumps(data, indent=indent))
+    os.replace(tmp_path, path)
@@ -5,7 +5,6 @@ Orchestrates data collection, analysis, and aggregation
 """
 import logging
 import sys
-import json
 from datetime import datetime
 from pathlib import Path
 
@@ -15,6 +14,7 @@ from risk_calculator import enrich_with_risk_metrics
 from news_fetcher import fetch_crypto_news
 from news_analyzer import analyze_news_relevance
 from aggregator import build_dashboard_data
+from json_utils import write_json
 
 # Setup logging
 log_dir = Path("logs")
@@ -78,8 +78,7 @@ def main():
         output_path = Path("../frontend/data/dashboard_data.json")
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(dashboard_data, f, indent=2, ensure_ascii=False)
+        write_json(output_path, dashboard_data)
 
         logger.info(f"✓ Dashboard data saved to {output_path}")
 
@@ -3,13 +3,17 @@
 News Analyzer - Analyzes news relevance to markets using Claude AI with fallback
 """
 import os
-import json
 import logging
 import time
-import hashlib
+import sqlite3
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timezone
 
+from json_utils import dumps, loads, write_json
+
 logger = logging.getLogger(__name__)
 
 # Check for Anthropic API
@@ -21,59 +25,153 @@ except ImportError:
     logger.warning("Anthropic library not available, will use keyword fallback only")
 
 
-CACHE_PATH = Path("data/news_analysis_cache.json")
+CACHE_PATH = Path("data/news_analysis_cache.db")
+
+# Claude API limits
+CLAUDE_RATE_LIMIT = 50  # requests per minute
+CLAUDE_MAX_WORKERS = 8  # concurrent in-flight requests
+
+CLAUDE_BATCH_SIZE = 10  # markets per request for the same news item
+
+# Prompt for analyze_with_claude (filled via str.format)
+CLAUDE_PROMPT = """Analyze if this news is relevant to each of the prediction markets below.
+
+NEWS: "{news}"
 
+MARKETS (one JSON object per line):
+{markets}
 
-def load_cache():
-    """Load analysis cache from file"""
-    if CACHE_PATH.exists():
-        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f).get('cache', {})
-    return {}
+Task, for each market:
+1. Determine relevance score (0-10, where 10 = highly relevant)
+2. If relevance >= 7, identify which outcome(s) it affects
+3. Determine impact direction: positive, negative, or neutral
+4. Provide confidence level: low, medium, high
 
+Respond with a JSON array containing one object per market:
+[
+  {{
+    "id": <market id from the list>,
+    "relevance_score": <0-10>,
+    "affects_outcomes": ["outcome1", "outcome2"],
+    "impact_direction": "positive|negative|neutral",
+    "confidence": "low|medium|high",
+    "reasoning": "brief explanation (1-2 sentences)"
+  }}
+]
 
-def save_cache(cache):
-    """Save analysis cache to file"""
+Only respond with JSON, no other text."""
+
+# Fields every Claude result must carry to be used
+CLAUDE_RESULT_FIELDS = ('relevance_score', 'affects_outcomes', 'impact_direction', 'confidence', 'reasoning')
+
+# Minimum relevance score kept in the mapping (lowered threshold for keyword matching)
+MIN_RELEVANCE_SCORE = 3
+
+# Words ignored when matching market questions against news titles
+STOPWORDS = frozenset({'the', 'a', 'an', 'will', 'be', 'is', 'in', 'of', 'to', 'for', 'on', 'at'})
+
+# Keyword sets are encoded as int bitsets over a shared vocabulary;
+# overlap is the popcount of their intersection
+if hasattr(int, 'bit_count'):  # Python 3.10+
+    popcount = int.bit_count
+else:
+    def popcount(bits):
+        return bin(bits).count('1')
+
+
+def open_cache():
+    """Open the analysis cache database, creating it if needed"""
     CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(CACHE_PATH, 'w', encoding='utf-8') as f:
-        json.dump({'cache': cache}, f, indent=2, ensure_ascii=False)
+    conn = sqlite3.connect(CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "news_title TEXT NOT NULL, market_id TEXT NOT NULL, value BLOB NOT NULL, "
+        "PRIMARY KEY (news_title, market_id))"
+    )
+    return conn
+
+
+def get_cached(conn, cache_key):
+    """Return cached analysis for a (news_title, market_id) key, or None"""
+    row = conn.execute(
+        "SELECT value FROM cache WHERE news_title = ? AND market_id = ?", cache_key
+    ).fetchone()
+    return loads(row[0]) if row else None
+
 
+def put_cached(conn, cache_key, result):
+    """Insert or update a single cache entry (committed by the caller)"""
+    conn.execute(
+        "INSERT OR REPLACE INTO cache (news_title, market_id, value) VALUES (?, ?, ?)",
+        (*cache_key, dumps(result))
+    )
 
-def get_cache_key(news_title, market_id):
-    """Generate cache key from news title and market ID"""
-    content = f"{news_title}:{market_id}"
-    return hashlib.md5(content.encode()).hexdigest()
 
+class RateLimiter:
+    """Thread-safe sliding-window rate limiter: at most max_calls per period seconds"""
 
-def keyword_fallback_analysis(news_title, market_question, market_outcomes):
+    def __init__(self, max_calls, period):
+        self.max_calls = max_calls
+        self.period = period
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call slot is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= self.period:
+                    self.calls.popleft()
+
+                if len(self.calls) < self.max_calls:
+                    self.calls.append(now)
+                    return
+
+                wait_time = self.period - (now - self.calls[0])
+
+            logger.info(f"Rate limit: waiting {wait_time:.1f}s...")
+            time.sleep(wait_time)
+
+
+def keyword_relevance_score(has_outcome_match, overlap):
+    """
+    Keyword relevance score (0-10)
+
+    Args:
+        has_outcome_match: bool, an outcome name appears in the news title
+        overlap: int, number of question keywords found in the news title
+    """
+    return min((5 if has_outcome_match else 0) + min(overlap * 0.5, 5), 10)
+
+
+def keyword_fallback_analysis(news_lower, news_bits, question_bits, market_outcomes, outcomes_lower):
     """
     Simple keyword matching as backup when Claude AI is unavailable
 
+    All inputs are precomputed by the caller once per news item / market.
+
+    Args:
+        news_lower: lowercased news title
+        news_bits: int bitset of news title words (vocabulary ids)
+        question_bits: int bitset of market question words minus STOPWORDS
+        market_outcomes: list of outcome names
+        outcomes_lower: lowercased outcome names, parallel to market_outcomes
+
     Returns:
         dict with relevance_score, affects_outcomes, impact_direction, confidence, reasoning
     """
-    news_lower = news_title.lower()
-    question_lower = market_question.lower()
-
     # Check for outcomes in news title
-    matching_outcomes = []
-    for outcome in market_outcomes:
-        if outcome.lower() in news_lower:
-            matching_outcomes.append(outcome)
+    matching_outcomes = [
+        outcome for outcome, outcome_lower in zip(market_outcomes, outcomes_lower)
+        if outcome_lower in news_lower
+    ]
 
     # Check keyword overlap
-    question_keywords = set(question_lower.split()) - {'the', 'a', 'an', 'will', 'be', 'is', 'in', 'of', 'to', 'for', 'on', 'at'}
-    news_keywords = set(news_lower.split())
-    overlap = len(question_keywords & news_keywords)
-
-    # Calculate simple relevance score
-    relevance_score = 0
-    if matching_outcomes:
-        relevance_score += 5
-    relevance_score += min(overlap * 0.5, 5)
+    overlap = popcount(question_bits & news_bits)
 
     return {
-        "relevance_score": min(relevance_score, 10),
+        "relevance_score": keyword_relevance_score(bool(matching_outcomes), overlap),
         "affects_outcomes": matching_outcomes,
         "impact_direction": "neutral",
         "confidence": "low",
@@ -82,53 +180,93 @@ def keyword_fallback_analysis(news_title, market_question, market_outcomes):
     }
 
 
-def analyze_with_claude(news_title, market_question, market_outcomes, client):
+def analyze_with_claude(news_title, markets, client):
     """
-    Analyze news relevance using Claude AI
+    Analyze news relevance to several markets with a single Claude AI request
+
+    Args:
+        news_title: news title
+        markets: list of (market_question, market_outcomes) tuples
+        client: Anthropic client
 
     Returns:
-        dict with analysis results
+        list of analysis result dicts parallel to markets (None for markets
+        missing from the reply), or None if the request failed
     """
-    prompt = f"""Analyze if this news is relevant to the prediction market.
-
-NEWS: "{news_title}"
-
-MARKET: "{market_question}"
-OUTCOMES: {', '.join(market_outcomes)}
-
-Task:
-1. Determine relevance score (0-10, where 10 = highly relevant)
-2. If relevance >= 7, identify which outcome(s) it affects
-3. Determine impact direction: positive, negative, or neutral
-4. Provide confidence level: low, medium, high
-
-Respond in JSON format:
-{{
-  "relevance_score": <0-10>,
-  "affects_outcomes": ["outcome1", "outcome2"],
-  "impact_direction": "positive|negative|neutral",
-  "confidence": "low|medium|high",
-  "reasoning": "brief explanation (1-2 sentences)"
-}}
-
-Only respond with JSON, no other text."""
+    markets_listing = '\n'.join(
+        dumps({'id': idx, 'question': question, 'outcomes': outcomes}).decode('utf-8')
+        for idx, (question, outcomes) in enumerate(markets)
+    )
+    prompt = CLAUDE_PROMPT.format(news=news_title, markets=markets_listing)
 
     try:
         response = client.messages.create(
             model="claude-3-5-sonnet-20241022",
-            max_tokens=500,
+            max_tokens=300 * len(markets) + 200,
             messages=[{"role": "user", "content": prompt}]
         )
 
-        result = json.loads(response.content[0].text)
-        result['analysis_method'] = 'claude_ai'
-        return result
+        reply = loads(response.content[0].text)
+        if isinstance(reply, dict) and len(markets) == 1:
+            reply = [{**reply, 'id': reply.get('id', 0)}]  # bare object for a single market
+
+        # Incomplete items leave their slot None (keyword fallback for that pair)
+        results = [None] * len(markets)
+        for item in reply:
+            if not isinstance(item, dict) or not all(field in item for field in CLAUDE_RESULT_FIELDS):
+                continue
+            idx = item.pop('id', None)
+            if isinstance(idx, int) and 0 <= idx < len(markets):
+                item['analysis_method'] = 'claude_ai'
+                results[idx] = item
+        return results
 
     except Exception as e:
         logger.error(f"Claude AI analysis failed: {e}")
         return None
 
 
+def analyze_pairs_with_claude(tasks, client):
+    """
+    Run Claude analysis for uncached news-market pairs
+
+    Pairs are grouped by news title into requests of up to CLAUDE_BATCH_SIZE
+    markets, which run concurrently under the shared rate limit.
+
+    Args:
+        tasks: dict of (news_title, market_id) -> (market_question, market_outcomes)
+        client: Anthropic client
+
+    Returns:
+        dict of (news_title, market_id) -> analysis result (None when the call failed)
+    """
+    rate_limiter = RateLimiter(CLAUDE_RATE_LIMIT, 60)
+
+    # Group by news title, then split into batches
+    keys_by_news = defaultdict(list)
+    for cache_key in tasks:
+        keys_by_news[cache_key[0]].append(cache_key)
+
+    batches = []
+    for news_title, keys in keys_by_news.items():
+        for start in range(0, len(keys), CLAUDE_BATCH_SIZE):
+            batches.append((news_title, keys[start:start + CLAUDE_BATCH_SIZE]))
+
+    def run(news_title, keys):
+        rate_limiter.acquire()
+        return analyze_with_claude(news_title, [tasks[key] for key in keys], client)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=CLAUDE_MAX_WORKERS) as executor:
+        futures = {executor.submit(run, news_title, keys): keys for news_title, keys in batches}
+        for future in as_completed(futures):
+            keys = futures[future]
+            batch_results = future.result() or [None] * len(keys)
+            results.update(zip(keys, batch_results))
+
+    return results
+
+
 def analyze_news_relevance(news_data, markets_with_metrics):
     """
     Analyze relevance of news to markets with rate limiting and caching
@@ -151,9 +289,6 @@ def analyze_news_relevance(news_data, markets_with_metrics):
         except Exception as e:
             logger.error(f"Failed to initialize Claude AI: {e}")
 
-    # Load cache
-    cache = load_cache()
-
     # Stats
     stats = {
         'total_analyzed': 0,
@@ -165,71 +300,124 @@ def analyze_news_relevance(news_data, markets_with_metrics):
 
     news_market_mapping = []
 
-    # Rate limiting
-    request_count = 0
-    start_time = time.time()
-
     # Limit to top 10 news
     top_news = news_data[:10]
 
     logger.info(f"Analyzing {len(top_news)} news articles against {len(markets_with_metrics)} markets...")
 
-    for news_idx, news in enumerate(top_news):
-        news_title = news.get('title', '')
-        news_link = news.get('link', '')
-
-        for market in markets_with_metrics:
-            market_id = market.get('market_id', '')  # Changed from 'id' to 'market_id'
-            market_question = market.get('question', '')
-            market_url = market.get('url', '')
-
-            # Get outcome names
-            outcomes = market.get('outcomes', [])
-            outcome_names = [o.get('name', '') for o in outcomes if o.get('name')]
-
-            if not outcome_names:
-                continue
+    # Pre-pass: per-market fields, keyword vocabulary and inverted index,
+    # skipping markets without an id (cache key) or without outcomes
+    prepared_markets = []
+    vocab = {}
+    inverted_index = defaultdict(list)
+    for market in markets_with_metrics:
+        market_id = market.get('market_id')  # Changed from 'id' to 'market_id'
+        if market_id is None:
+            continue
+
+        outcome_names = [o.get('name', '') for o in market.get('outcomes', []) if o.get('name')]
+        if not outcome_names:
+            continue
+
+        market_question = market.get('question', '')
+        outcomes_lower = [name.lower() for name in outcome_names]
+        question_tokens = set(market_question.lower().split()) - STOPWORDS
+        question_bits = 0
+        for token in question_tokens:
+            question_bits |= 1 << vocab.setdefault(token, len(vocab))
+
+        # Outcome name words are indexed too: an outcome match alone scores 5
+        outcome_tokens = {token for name in outcomes_lower for token in name.split()}
+        for token in question_tokens | outcome_tokens:
+            vocab.setdefault(token, len(vocab))
+            inverted_index[token].append(len(prepared_markets))
+
+        prepared_markets.append((
+            market_id,
+            market_question,
+            market.get('url', ''),
+            outcome_names,
+            outcomes_lower,
+            question_bits
+        ))
+
+    # Open cache; entries written so far are committed even if the run fails
+    cache = open_cache()
+    try:
+        # Collect candidate pairs and the uncached ones that need a Claude call.
+        # Without Claude the keyword score is final, so pairs that cannot reach
+        # MIN_RELEVANCE_SCORE are dropped before any cache lookup.
+        pairs = []
+        claude_tasks = {}
+        for news_idx, news in enumerate(top_news):
+            news_title = news.get('title', '')
+            news_lower = news_title.lower()
+
+            # Only markets sharing at least one keyword with the news title are candidates
+            news_bits = 0
+            candidate_idxs = set()
+            for token in set(news_lower.split()):
+                if token in vocab:
+                    news_bits |= 1 << vocab[token]
+                    candidate_idxs.update(inverted_index[token])
+
+            for market_idx in sorted(candidate_idxs):
+                market_id, market_question, market_url, outcome_names, outcomes_lower, question_bits = prepared_markets[market_idx]
+
+                fallback = keyword_fallback_analysis(
+                    news_lower, news_bits, question_bits, outcome_names, outcomes_lower
+                )
+                if claude_client is None and fallback['relevance_score'] < MIN_RELEVANCE_SCORE:
+                    continue
+
+                cache_key = (news_title, market_id)
+                cached = get_cached(cache, cache_key)
+                pairs.append((news_idx, news, market_idx, cache_key, cached, fallback))
+
+                if claude_client and cached is None:
+                    claude_tasks[cache_key] = (market_question, outcome_names)
+
+        claude_results = {}
+        if claude_tasks:
+            logger.info(f"Requesting Claude AI analysis for {len(claude_tasks)} uncached pairs "
+                        f"(batches of up to {CLAUDE_BATCH_SIZE})...")
+            claude_results = analyze_pairs_with_claude(claude_tasks, claude_client)
+
+            # Persist paid results right away, independent of the assembly below
+            for cache_key, result in claude_results.items():
+                if result:
+                    put_cached(cache, cache_key, result)
+            cache.commit()
+
+        for news_idx, news, market_idx, cache_key, cached, fallback in pairs:
+            market_id, market_question, market_url = prepared_markets[market_idx][:3]
 
             # Check cache
-            cache_key = get_cache_key(news_title, market_id)
-            if cache_key in cache:
-                result = cache[cache_key]
+            if cached is not None:
+                result = cached
                 stats['cached'] += 1
             else:
-                # Try Claude AI first
-                result = None
-                if claude_client:
-                    # Rate limiting check
-                    if request_count >= 50:
-                        elapsed = time.time() - start_time
-                        if elapsed < 60:
-                            wait_time = 60 - elapsed
-                            logger.info(f"Rate limit: waiting {wait_time:.1f}s...")
-                            time.sleep(wait_time)
-                        start_time = time.time()
-                        request_count = 0
-
-                    result = analyze_with_claude(news_title, market_question, outcome_names, claude_client)
-                    if result:
-                        stats['claude_ai'] += 1
-                        request_count += 1
+                # Try Claude AI first (already cached after the Claude phase)
+                result = claude_results.get(cache_key)
+                if result:
+                    stats['claude_ai'] += 1
 
                 # Fallback to keyword matching
                 if not result:
-                    result = keyword_fallback_analysis(news_title, market_question, outcome_names)
+                    result = fallback
                     stats['keyword_fallback'] += 1
 
-                # Cache result
-                cache[cache_key] = result
+                    # Cache result
+                    put_cached(cache, cache_key, result)
 
             stats['total_analyzed'] += 1
 
-            # Only keep if relevance >= 3 (lowered threshold for keyword matching)
-            if result.get('relevance_score', 0) >= 3:
+            # Only keep if relevance >= MIN_RELEVANCE_SCORE
+            if result.get('relevance_score', 0) >= MIN_RELEVANCE_SCORE:
                 news_market_mapping.append({
                     'news_id': news_idx,
-                    'news_title': news_title,
-                    'news_link': news_link,
+                    'news_title': news.get('title', ''),
+                    'news_link': news.get('link', ''),
                     'market_id': market_id,
                     'market_question': market_question,
                     'market_url': market_url,
@@ -240,25 +428,24 @@ def analyze_news_relevance(news_data, markets_with_metrics):
                     'reasoning': result['reasoning'],
                     'analysis_method': result['analysis_method']
                 })
-
-        logger.info(f"Analyzed news {news_idx + 1}/{len(top_news)}")
-
-    # Save cache
-    save_cache(cache)
+    finally:
+        cache.commit()
+        cache.close()
 
     # Save results
-    save_analysis(news_market_mapping, stats)
+    analyzed_at = datetime.now(timezone.utc).isoformat()
+    save_analysis(news_market_mapping, stats, analyzed_at)
 
     logger.info(f"Analysis complete: {stats}")
 
     return {
         'news_market_mapping': news_market_mapping,
         'stats': stats,
-        'analyzed_at': datetime.now(timezone.utc).isoformat()
+        'analyzed_at': analyzed_at
     }
 
 
-def save_analysis(mappings, stats):
+def save_analysis(mappings, stats, analyzed_at):
     """Save analysis results to file"""
     analysis_path = Path("data/news_analyzed.json")
     analysis_path.parent.mkdir(parents=True, exist_ok=True)
@@ -266,11 +453,10 @@ def save_analysis(mappings, stats):
     data = {
         'news_market_mapping': mappings,
         'stats': stats,
-        'analyzed_at': datetime.now(timezone.utc).isoformat()
+        'analyzed_at': analyzed_at
     }
 
-    with open(analysis_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    write_json(analysis_path, data)
 
     logger.info(f"Saved analysis to {analysis_path}")
 
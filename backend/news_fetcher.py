@@ -2,15 +2,30 @@
 """
 News Fetcher - Fetches crypto news from RSS feeds
 """
+import io
+import re
 import feedparser
 import requests
 import logging
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from json_utils import write_json
 
 logger = logging.getLogger(__name__)
 
+# Check for lxml (C parser, much faster than feedparser)
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    logger.info("lxml not available, using feedparser only")
+
 RSS_SOURCES = {
     'chaingpt': 'https://api.chaingpt.org/ai-news/rss',
     'cointelegraph': 'https://cointelegraph.com/rss',
@@ -18,11 +33,173 @@ RSS_SOURCES = {
     'cryptonews': 'https://crypto.news/feed'
 }
 
+# Shared session: keep-alive connection pool across feeds and retries
+# (fetch with requests first, feedparser doesn't handle User-Agent well)
+_SESSION = requests.Session()
+_SESSION.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'})
+_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.3))
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+# XML namespaces read by the lxml parser
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+
+# Trailing " - Source" / " | Source" attribution some feeds append to titles
+_TITLE_SUFFIX_RE = re.compile(r'\s+[-–—|]\s+([^-–—|]+)$')
+
+
+def _normalize_title(title):
+    """
+    Canonical form of a news title for deduplication
+
+    Lowercases, collapses whitespace and drops a trailing source attribution
+    (e.g. "... - Cointelegraph") when it names one of RSS_SOURCES.
+    """
+    normalized = ' '.join(title.lower().split())
+
+    match = _TITLE_SUFFIX_RE.search(normalized)
+    if match and re.sub(r'\W', '', match.group(1)) in RSS_SOURCES:
+        normalized = normalized[:match.start()]
+
+    return normalized
+
+
+def _parse_date(text):
+    """Parse an RSS (RFC 822) or Atom (ISO 8601) date into a UTC datetime, or None"""
+    if not text:
+        return None
+
+    text = text.strip()
+    try:
+        published = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            published = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _parse_entries_lxml(content):
+    """
+    Stream RSS <item> / Atom <entry> elements with lxml
+
+    Child elements are looked up in the item's own namespace (none for
+    RSS 2.0), so extension elements such as <media:title> or
+    <atom:link rel="self"> are never mistaken for the item's own fields.
+
+    Returns:
+        list of (title, link, published, summary) tuples
+    """
+    entries = []
+
+    for _, elem in etree.iterparse(io.BytesIO(content), events=('end',),
+                                   tag=('{*}item', ATOM_NS + 'entry'), resolve_entities=False):
+        if elem.tag == ATOM_NS + 'entry':
+            # Atom: URL in the href of the rel="alternate" (or rel-less) link
+            link = next(
+                (link_elem.get('href', '') for link_elem in elem.iterfind(ATOM_NS + 'link')
+                 if link_elem.get('rel', 'alternate') == 'alternate'),
+                ''
+            )
+            published = _parse_date(elem.findtext(ATOM_NS + 'published') or elem.findtext(ATOM_NS + 'updated'))
+            summary = elem.findtext(ATOM_NS + 'summary') or ''
+            title = elem.findtext(ATOM_NS + 'title') or ''
+        else:
+            # RSS 2.0 (no namespace) or RSS 1.0 (<item> in the RSS 1.0 namespace)
+            ns = elem.tag[:elem.tag.index('}') + 1] if elem.tag.startswith('{') else ''
+            link = (elem.findtext(ns + 'link') or '').strip()
+            published = _parse_date(elem.findtext(ns + 'pubDate') or elem.findtext(DC_NS + 'date'))
+            summary = elem.findtext(ns + 'description') or ''
+            title = elem.findtext(ns + 'title') or ''
+
+        entries.append((title, link, published, summary))
+
+        # Free the parsed subtree
+        elem.clear()
+
+    return entries
+
+
+def _parse_entries_feedparser(content):
+    """
+    Parse feed entries with feedparser (slower, but tolerant of malformed XML)
+
+    Returns:
+        list of (title, link, published, summary) tuples
+    """
+    entries = []
+
+    for entry in feedparser.parse(content).entries:
+        # Parse published date
+        published = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+            published = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
+
+        entries.append((entry.get('title', ''), entry.get('link', ''), published, entry.get('summary', '')))
+
+    return entries
+
+
+def _fetch_one(source_name, feed_url, cutoff_time):
+    """
+    Fetch and parse a single RSS feed
+
+    Returns:
+        list of news dicts newer than cutoff_time (empty on failure)
+    """
+    news = []
+
+    try:
+        logger.info(f"Fetching from {source_name}...")
+        response = _SESSION.get(feed_url, timeout=10)
+        response.raise_for_status()
+
+        # Parse the fetched content
+        entries = None
+        if LXML_AVAILABLE:
+            try:
+                entries = _parse_entries_lxml(response.content)
+            except etree.XMLSyntaxError as e:
+                logger.warning(f"lxml could not parse {source_name} ({e}), falling back to feedparser")
+
+        if entries is None:
+            entries = _parse_entries_feedparser(response.content)
+
+        for title, link, published, summary in entries:
+            # Skip if too old
+            if published and published < cutoff_time:
+                continue
+
+            title = title.strip()
+            if title:
+                news.append({
+                    'title': title,
+                    'link': link,
+                    'published_at': published.isoformat() if published else None,
+                    'source': source_name,
+                    'summary': summary[:200] if summary else ''
+                })
+
+    except Exception as e:
+        logger.error(f"Failed to fetch from {source_name}: {e}")
+
+    return news
+
 
 def fetch_crypto_news(hours=48):
     """
     Fetch crypto news from RSS feeds for the last N hours
 
+    All feeds are fetched concurrently; results are merged in RSS_SOURCES
+    order so deduplication stays deterministic.
+
     Args:
         hours: int, how many hours back to fetch (default 48)
 
@@ -30,56 +207,32 @@ def fetch_crypto_news(hours=48):
         list of news dicts
     """
     cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+
+    logger.info(f"Fetching news from last {hours} hours...")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(RSS_SOURCES)) as executor:
+        futures = {
+            executor.submit(_fetch_one, source_name, feed_url, cutoff_time): source_name
+            for source_name, feed_url in RSS_SOURCES.items()
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    # Merge and deduplicate by normalized title
     all_news = []
     seen_titles = set()
 
-    logger.info(f"Fetching news from last {hours} hours...")
+    for source_name in RSS_SOURCES:
+        source_count = 0
+        for item in results.get(source_name, []):
+            title_key = _normalize_title(item['title'])
+            if title_key not in seen_titles:
+                seen_titles.add(title_key)
+                all_news.append(item)
+                source_count += 1
 
-    for source_name, feed_url in RSS_SOURCES.items():
-        try:
-            logger.info(f"Fetching from {source_name}...")
-            # Fetch with requests first (feedparser doesn't handle User-Agent well)
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            response = requests.get(feed_url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            # Parse the fetched content
-            feed = feedparser.parse(response.content)
-
-            for entry in feed.entries:
-                # Parse published date
-                published = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    published = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
-
-                # Skip if too old
-                if published and published < cutoff_time:
-                    continue
-
-                # Extract data
-                title = entry.get('title', '').strip()
-                link = entry.get('link', '')
-                summary = entry.get('summary', '')
-
-                # Deduplicate by title
-                if title and title not in seen_titles:
-                    seen_titles.add(title)
-
-                    all_news.append({
-                        'title': title,
-                        'link': link,
-                        'published_at': published.isoformat() if published else None,
-                        'source': source_name,
-                        'summary': summary[:200] if summary else ''
-                    })
-
-            logger.info(f"  Found {len([n for n in all_news if n['source'] == source_name])} from {source_name}")
-
-        except Exception as e:
-            logger.error(f"Failed to fetch from {source_name}: {e}")
-            continue
+        logger.info(f"  Found {source_count} from {source_name}")
 
     # Sort by published date (newest first)
     all_news.sort(key=lambda x: x['published_at'] or '', reverse=True)
@@ -103,8 +256,7 @@ def save_news(news_list):
         "total_count": len(news_list)
     }
 
-    with open(news_path, 'w', encoding='utf-8') as f:
-        json.dump(news_data, f, indent=2, ensure_ascii=False)
+    write_json(news_path, news_data)
 
     logger.info(f"Saved news to {news_path}")
 
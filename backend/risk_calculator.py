@@ -4,12 +4,53 @@ Risk Calculator - Calculates risk-reward metrics for market outcomes
 """
 import math
 import logging
-from copy import deepcopy
+from functools import lru_cache
+
+from json_utils import loads
 
 logger = logging.getLogger(__name__)
 
 
-def calculate_risk_reward_score(probability, price, volume):
+@lru_cache(maxsize=4096)
+def _parse_json_list(value):
+    """
+    Parse a JSON-encoded array string such as '["Yes", "No"]'
+
+    Cached: most markets share the same outcomes string, and the strings
+    are immutable, so repeated values are parsed once per process.
+
+    Returns:
+        tuple (immutable, safe to share between markets)
+    """
+    return tuple(loads(value))
+
+
+def _to_float_or_none(value):
+    """Convert a price string/number to float, or None if it is not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def calculate_volume_weight(volume):
+    """
+    Liquidity weight (logarithmic scale)
+
+    Args:
+        volume: float, trading volume in USD
+
+    Returns:
+        float in [0.1, 1.0]
+    """
+    if volume > 0:
+        # log scale: log10(volume) normalized to [0, 1]
+        # $10k = 0.5, $100k = 0.75, $1M = 1.0
+        return min(max((math.log10(volume) - 4) / 3, 0.1), 1.0)
+    return 0.1
+
+
+def calculate_risk_reward_score(probability, price, volume, volume_weight=None):
     """
     Calculate risk-reward score using EV, Kelly Criterion, and liquidity
 
@@ -17,9 +58,11 @@ def calculate_risk_reward_score(probability, price, volume):
         probability: float (0-1), win probability
         price: float (0-1), price in dollars (0.18 = 18¢)
         volume: float, trading volume in USD
+        volume_weight: float, precomputed calculate_volume_weight(volume);
+            pass it when scoring many outcomes of the same market
 
     Returns:
-        dict with score, multiplier, ev, kelly, volume_weight
+        dict with score, multiplier, ev, kelly, volume_weight, risk_category
     """
     # 1. Multiplier
     multiplier = 1 / price if price > 0 else 0
@@ -39,12 +82,8 @@ def calculate_risk_reward_score(probability, price, volume):
         kelly_fraction = 0
 
     # 4. Liquidity weight (logarithmic scale)
-    if volume > 0:
-        # log scale: log10(volume) normalized to [0, 1]
-        # $10k = 0.5, $100k = 0.75, $1M = 1.0
-        volume_weight = min(max((math.log10(volume) - 4) / 3, 0.1), 1.0)
-    else:
-        volume_weight = 0.1
+    if volume_weight is None:
+        volume_weight = calculate_volume_weight(volume)
 
     # 5. Final score
     # In efficient prediction markets, price ≈ true probability, so EV ≈ 0
@@ -52,12 +91,16 @@ def calculate_risk_reward_score(probability, price, volume):
     # Score = (multiplier - 1) × volume_weight (higher multiplier + volume = better)
     score = max(0, multiplier - 1) * volume_weight
 
+    # 6. Risk category (from the displayed, rounded multiplier)
+    display_multiplier = round(multiplier, 2)
+
     return {
         'score': round(score, 6),
-        'multiplier': round(multiplier, 2),
+        'multiplier': display_multiplier,
         'expected_value': round(ev, 4),
         'kelly_fraction': round(kelly_fraction, 4),
-        'volume_weight': round(volume_weight, 4)
+        'volume_weight': round(volume_weight, 4),
+        'risk_category': categorize_risk(probability, display_multiplier)
     }
 
 
@@ -87,6 +130,9 @@ def enrich_with_risk_metrics(markets_data):
     - Each event group has multiple markets under 'markets' key
     - Each market has outcomes and outcomePrices like: ["0.07", "0.93"]
 
+    The input is only read, never mutated, so nothing is copied; the
+    enriched records are new dicts and are treated as read-only downstream.
+
     Args:
         markets_data: list of event group dicts
 
@@ -103,10 +149,11 @@ def enrich_with_risk_metrics(markets_data):
             outcomes_str = market.get('outcomes', '[]')
             prices_str = market.get('outcomePrices', '[]')
 
+            # The API returns both as JSON-encoded arrays
             try:
-                outcomes_list = eval(outcomes_str) if isinstance(outcomes_str, str) else outcomes_str
-                prices_list = eval(prices_str) if isinstance(prices_str, str) else prices_str
-            except:
+                outcomes_list = _parse_json_list(outcomes_str) if isinstance(outcomes_str, str) else outcomes_str
+                prices_list = _parse_json_list(prices_str) if isinstance(prices_str, str) else prices_str
+            except (ValueError, TypeError):
                 logger.warning(f"Failed to parse outcomes/prices for market {market.get('id')}")
                 continue
 
@@ -115,32 +162,26 @@ def enrich_with_risk_metrics(markets_data):
             market_url = f"https://polymarket.com/event/{market.get('slug', '')}"
             market_question = market.get('question', '')
             market_end_date = market.get('endDate', '')
+            volume_weight = calculate_volume_weight(market_volume)  # same for every outcome
 
             # Process each outcome
             market_outcomes = []
             for outcome_name, price_str in zip(outcomes_list, prices_list):
-                try:
-                    price = float(price_str)
-                    probability = price  # In prediction markets, price ≈ probability
-
-                    # Calculate metrics
-                    risk_metrics = calculate_risk_reward_score(probability, price, market_volume)
-
-                    # Add risk category
-                    risk_category = categorize_risk(probability, risk_metrics['multiplier'])
-                    risk_metrics['risk_category'] = risk_category
-
-                    market_outcomes.append({
-                        'name': outcome_name,
-                        'price': price,
-                        'probability': probability,
-                        'volume': market_volume,
-                        'risk_metrics': risk_metrics
-                    })
-                except Exception as e:
-                    logger.warning(f"Failed to process outcome {outcome_name}: {e}")
+                price = _to_float_or_none(price_str)
+                if price is None:
+                    logger.warning(f"Failed to process outcome {outcome_name}: invalid price {price_str!r}")
                     continue
 
+                probability = price  # In prediction markets, price ≈ probability
+
+                market_outcomes.append({
+                    'name': outcome_name,
+                    'price': price,
+                    'probability': probability,
+                    'volume': market_volume,
+                    'risk_metrics': calculate_risk_reward_score(probability, price, market_volume, volume_weight)
+                })
+
             # Create enriched market record
             enriched_markets.append({
                 'question': market_question,
@@ -174,7 +215,7 @@ if __name__ == "__main__":
 
     for tc in test_cases:
         result = calculate_risk_reward_score(tc['prob'], tc['price'], tc['volume'])
-        category = categorize_risk(tc['prob'], result['multiplier'])
+        category = result['risk_category']
 
         print(f"\n{tc['desc']}:")
         print(f"  Probability: {tc['prob']*100:.1f}%")
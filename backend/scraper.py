@@ -2,18 +2,63 @@
 """
 Polymarket Scraper - Fetches market data from Gamma API
 """
+import heapq
+import re
 import requests
 import json
 import logging
 import time
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+from itertools import chain
 from pathlib import Path
 
+from json_utils import loads, write_json
+
 logger = logging.getLogger(__name__)
 
+# Check for ciso8601 (C ISO-8601 parser, faster than datetime.fromisoformat)
+try:
+    import ciso8601
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+    logger.info("ciso8601 not available, using datetime.fromisoformat")
+
 GAMMA_API_BASE = "https://gamma-api.polymarket.com"
 MARKETS_LIMIT = 500  # Fetch more markets to find diverse closing soon options
 
+# Shared session: retries reuse the keep-alive connection instead of a new
+# TCP+TLS handshake (requests already sends Accept-Encoding: gzip, deflate
+# and decompresses transparently)
+_SESSION = requests.Session()
+_SESSION.headers.update({'User-Agent': 'polymarket-scraper/1.0'})
+
+# Crypto detection keywords
+CRYPTO_KEYWORDS = frozenset({
+    'bitcoin', 'btc', 'ethereum', 'eth', 'crypto', 'solana', 'sol',
+    'xrp', 'ripple', 'cardano', 'ada', 'polygon', 'matic', 'doge',
+    'dogecoin', 'shiba', 'avalanche', 'avax', 'polkadot', 'dot',
+    'chainlink', 'link', 'uniswap', 'uni', 'litecoin', 'ltc',
+    'binance', 'bnb', 'tether', 'usdt', 'usdc', 'dai', 'stablecoin',
+    'defi', 'nft', 'web3', 'blockchain', 'token', 'coin'
+})
+
+# One alternation scans the text once instead of one substring test per keyword
+# (plain substring semantics, matched against lowercased text)
+CRYPTO_RE = re.compile('|'.join(map(re.escape, sorted(CRYPTO_KEYWORDS, key=len, reverse=True))))
+
+
+def parse_end_date(end_date_str):
+    """
+    Parse an ISO-8601 endDate such as "2025-12-31T23:59:59Z"
+
+    Raises:
+        ValueError: if the string is not valid ISO-8601
+    """
+    if CISO8601_AVAILABLE:
+        return ciso8601.parse_datetime(end_date_str)
+    return datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
+
 
 def fetch_polymarket_markets(limit=MARKETS_LIMIT, max_retries=3):
     """
@@ -33,75 +78,66 @@ def fetch_polymarket_markets(limit=MARKETS_LIMIT, max_retries=3):
     for attempt in range(max_retries):
         try:
             logger.info(f"Fetching markets from Gamma API (attempt {attempt + 1}/{max_retries})...")
-            response = requests.get(url, params=params, timeout=30)
+            response = _SESSION.get(url, params=params, timeout=30)
             response.raise_for_status()
 
-            all_markets = response.json()
+            all_markets = loads(response.content)
+            # Release the raw payload so the bytes and the parsed tree are
+            # not both held through filtering and the snapshot write
+            response.close()
+            del response
             logger.info(f"Received {len(all_markets)} total markets")
 
             # Strategy: Sort by volume24hr and filter crypto by keywords
             # (API no longer provides trending/crypto tags)
 
-            # Sort by volume descending
-            sorted_markets = sorted(
+            # Top 100 by volume = "trending" (partial heap selection, same
+            # order as a full descending sort)
+            trending_markets = heapq.nlargest(
+                100,
                 all_markets,
-                key=lambda m: m.get('volume24hr', 0),
-                reverse=True
+                key=lambda m: m.get('volume24hr', 0) or 0
             )
 
-            # Top 100 by volume = "trending"
-            trending_markets = sorted_markets[:100]
-
-            # Crypto detection keywords
-            crypto_keywords = {
-                'bitcoin', 'btc', 'ethereum', 'eth', 'crypto', 'solana', 'sol',
-                'xrp', 'ripple', 'cardano', 'ada', 'polygon', 'matic', 'doge',
-                'dogecoin', 'shiba', 'avalanche', 'avax', 'polkadot', 'dot',
-                'chainlink', 'link', 'uniswap', 'uni', 'litecoin', 'ltc',
-                'binance', 'bnb', 'tether', 'usdt', 'usdc', 'dai', 'stablecoin',
-                'defi', 'nft', 'web3', 'blockchain', 'token', 'coin'
-            }
-
-            crypto_markets = []
-            for market in all_markets:
-                title = market.get('title', '').lower()
-                desc = market.get('description', '').lower()
-
-                # Check if any crypto keyword is in title or description
-                if any(kw in title or kw in desc for kw in crypto_keywords):
-                    crypto_markets.append(market)
-                    if len(crypto_markets) >= 50:
-                        break
-
-            # Find markets closing within 60 days
-            from datetime import datetime, timezone, timedelta
+            # Single pass: first 50 crypto markets (by keywords) and
+            # first 30 markets closing within 60 days
             now = datetime.now(timezone.utc)
             closing_soon_cutoff = now + timedelta(days=60)
 
+            crypto_markets = []
             closing_soon_markets = []
             for market in all_markets:
-                end_date_str = market.get('endDate', '')
-                if end_date_str:
-                    try:
-                        end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-                        if now < end_date <= closing_soon_cutoff:
-                            closing_soon_markets.append(market)
-                            if len(closing_soon_markets) >= 30:
-                                break
-                    except:
-                        pass
+                if len(crypto_markets) < 50:
+                    title = market.get('title', '').lower()
+                    desc = market.get('description', '').lower()
+
+                    # Check if any crypto keyword is in title or description
+                    if CRYPTO_RE.search(f"{title}\n{desc}"):
+                        crypto_markets.append(market)
+
+                if len(closing_soon_markets) < 30:
+                    end_date_str = market.get('endDate', '')
+                    if end_date_str:
+                        try:
+                            end_date = parse_end_date(end_date_str)
+                            if now < end_date <= closing_soon_cutoff:
+                                closing_soon_markets.append(market)
+                        except (ValueError, TypeError):
+                            pass
+
+                if len(crypto_markets) >= 50 and len(closing_soon_markets) >= 30:
+                    break
 
             logger.info(f"Filtered: {len(trending_markets)} trending (by volume), {len(crypto_markets)} crypto (by keywords), {len(closing_soon_markets)} closing soon (60 days)")
 
             # Deduplicate by market ID (trending has priority, then crypto, then closing soon)
-            seen_ids = set()
-            final_markets = []
-
-            for market in trending_markets + crypto_markets + closing_soon_markets:
+            # (a dict keeps first-seen order; setdefault never overwrites)
+            markets_by_id = {}
+            for market in chain(trending_markets, crypto_markets, closing_soon_markets):
                 market_id = market.get('id')
-                if market_id and market_id not in seen_ids:
-                    final_markets.append(market)
-                    seen_ids.add(market_id)
+                if market_id:
+                    markets_by_id.setdefault(market_id, market)
+            final_markets = list(markets_by_id.values())
 
             logger.info(f"Final deduplicated markets: {len(final_markets)}")
 
@@ -110,7 +146,8 @@ def fetch_polymarket_markets(limit=MARKETS_LIMIT, max_retries=3):
 
             return final_markets
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # ValueError: body is not valid JSON (orjson raises a plain ValueError)
             logger.error(f"Request failed (attempt {attempt + 1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
                 wait_time = 2 ** attempt  # Exponential backoff
@@ -137,8 +174,7 @@ def save_snapshot(markets):
         "count": len(markets)
     }
 
-    with open(snapshot_path, 'w', encoding='utf-8') as f:
-        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+    write_json(snapshot_path, snapshot)
 
     logger.info(f"Saved snapshot to {snapshot_path}")
 
@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 """Integration test for backend with mock data"""
 import sys
-import json
+from pathlib import Path
 sys.path.insert(0, 'backend')
 
+from json_utils import loads, write_json
 from risk_calculator import enrich_with_risk_metrics
 from aggregator import build_dashboard_data
 
 # Load mock markets
-with open('test_data/mock_markets.json', 'r') as f:
-    mock_data = json.load(f)
+mock_data = loads(Path('test_data/mock_markets.json').read_bytes())
 
 markets = mock_data['markets']
 
@@ -73,8 +73,7 @@ news = dashboard_data['widgets']['news_feed']
 print(f"  News items: {len(news)}")
 
 # Save test output
-with open('frontend/data/dashboard_data.json', 'w') as f:
-    json.dump(dashboard_data, f, indent=2, ensure_ascii=False)
+write_json('frontend/data/dashboard_data.json', dashboard_data, indent=True)
 
 print("\n✅ ALL INTEGRATION TESTS PASSED")
 print(f"Dashboard data saved to frontend/data/dashboard_data.json")